@@ -1,5 +1,13 @@
 // background.js
 
+// --- CONSTANTS ---
+const NEWLINE_PATTERN = /\n/g;
+// Same fields as Date#toLocaleString(), but the formatter is built only once
+const TIMESTAMP_FORMATTER = new Intl.DateTimeFormat(undefined, {
+  year: 'numeric', month: 'numeric', day: 'numeric',
+  hour: 'numeric', minute: 'numeric', second: 'numeric',
+});
+
 // --- STATE MANAGEMENT ---
 let collectedTweets = [];
 let storedTweetIds = new Set();
@@ -19,7 +27,7 @@ browser.runtime.onMessage.addListener(async (message, sender) => {
   if (message.action === 'start-export') {
     handleStartExport(sender.tab);
   } else if (message.action === 'export-data') {
-    await handleExportData(message.data);
+    handleExportData(message.data);
   } else if (message.action === 'save-file') {
     await handleSaveFile();
   }
@@ -44,7 +52,7 @@ const handleStartExport = async (tab) => {
     await browser.tabs.sendMessage(tab.id, { action: 'start-export-in-page' });
 };
 
-const handleExportData = async (newTweets) => {
+const handleExportData = (newTweets) => {
   if (!newTweets || newTweets.length === 0) {
     console.log("No new bookmarks to export.");
     browser.runtime.sendMessage({ action: 'export-status', status: 'No new bookmarks found.' });
@@ -76,13 +84,11 @@ const handleExportData = async (newTweets) => {
 const handleSaveFile = async () => {
   await saveMarkdownToFile(markdownContent);
 
-  // Update stored tweet IDs
-  const newTweetIds = collectedTweets.map(t => t.id);
-  const updatedTweetIds = new Set([...storedTweetIds, ...newTweetIds]);
-  await browser.storage.local.set({ exportedTweetIds: Array.from(updatedTweetIds) });
-
-  // Update in-memory set
-  storedTweetIds = updatedTweetIds;
+  // Add only the newly exported IDs to the in-memory set, then persist it
+  for (const tweet of collectedTweets) {
+    storedTweetIds.add(tweet.id);
+  }
+  await browser.storage.local.set({ exportedTweetIds: Array.from(storedTweetIds) });
 
   console.log(`Export complete. Stored ${storedTweetIds.size} total tweet IDs.`);
   browser.runtime.sendMessage({ action: 'export-status', status: `Exported ${collectedTweets.length} new bookmarks!` });
@@ -97,74 +103,82 @@ const handleSaveFile = async () => {
 const generateMarkdown = (tweets) => {
   if (!tweets || tweets.length === 0) return "";
 
-  // Sort tweets by timestamp (newest first)
-  tweets.sort((a, b) => new Date(b.timestamp) - new Date(a.timestamp));
+  // Sort tweets by timestamp (newest first). The timestamps are ISO-8601 UTC
+  // strings, so comparing them lexicographically matches chronological order.
+  tweets.sort((a, b) => (a.timestamp < b.timestamp ? 1 : a.timestamp > b.timestamp ? -1 : 0));
 
-  let md = `# Twitter Bookmarks Export\n\n`;
-  md += `*Exported on: ${new Date().toUTCString()}*\n`;
-  md += `*Total new bookmarks in this file: ${tweets.length}*\n\n---\n\n`;
+  // Collect each section and join once rather than growing a single string
+  const sections = [
+    `# Twitter Bookmarks Export\n\n`,
+    `*Exported on: ${new Date().toUTCString()}*\n`,
+    `*Total new bookmarks in this file: ${tweets.length}*\n\n---\n\n`,
+  ];
 
   for (const tweet of tweets) {
-    md += formatTweetToMarkdown(tweet);
+    formatTweetToMarkdown(tweet, sections);
   }
 
-  return md;
+  return sections.join('');
 };
 
-const formatTweetToMarkdown = (tweet) => {
-  let content = `## ${tweet.author_name} (${tweet.author_handle})\n\n`;
-
-  const formattedTime = new Date(tweet.timestamp).toLocaleString();
-  content += `*[${formattedTime}](${tweet.url})*\n\n`;
+const formatTimestamp = (timestamp) => {
+  const date = new Date(timestamp);
+  return Number.isNaN(date.getTime()) ? 'Unknown date' : TIMESTAMP_FORMATTER.format(date);
+};
 
-  content += `${tweet.text.replace(/\n/g, '\n\n')}\n\n`;
+// The formatters append their pieces to a shared `parts` array so the whole
+// export is assembled with a single join in generateMarkdown.
+const formatTweetToMarkdown = (tweet, parts) => {
+  parts.push(
+    `## ${tweet.author_name} (${tweet.author_handle})\n\n`,
+    `*[${formatTimestamp(tweet.timestamp)}](${tweet.url})*\n\n`,
+    `${tweet.text.replace(NEWLINE_PATTERN, '\n\n')}\n\n`,
+  );
 
   if (tweet.images && tweet.images.length > 0) {
-    content += "**Images:**\n";
+    parts.push("**Images:**\n");
     for (const imgUrl of tweet.images) {
-      content += `![Image](${imgUrl})\n`;
+      parts.push(`![Image](${imgUrl})\n`);
     }
-    content += "\n";
+    parts.push("\n");
   }
 
   if (tweet.videos && tweet.videos.length > 0) {
-    content += "**Videos:**\n";
+    parts.push("**Videos:**\n");
     for (const videoUrl of tweet.videos) {
-      content += `- [Video Link](${videoUrl})\n`;
+      parts.push(`- [Video Link](${videoUrl})\n`);
     }
-    content += "\n";
+    parts.push("\n");
   }
 
   if (tweet.quoted_tweet) {
-      content += `> **Quoted Tweet:**\n`
-      content += formatQuotedTweet(tweet.quoted_tweet);
+      parts.push(`> **Quoted Tweet:**\n`);
+      formatQuotedTweet(tweet.quoted_tweet, parts);
   }
 
-  content += "---\n\n";
-  return content;
+  parts.push("---\n\n");
 };
 
-const formatQuotedTweet = (qt) => {
-    let quotedContent = `> **${qt.author_name} (${qt.author_handle})**\n`;
-    const formattedQuotedTime = new Date(qt.timestamp).toLocaleString();
-    quotedContent += `> *[${formattedQuotedTime}](${qt.url})*\n\n`;
+const formatQuotedTweet = (qt, parts) => {
+    parts.push(
+      `> **${qt.author_name} (${qt.author_handle})**\n`,
+      `> *[${formatTimestamp(qt.timestamp)}](${qt.url})*\n\n`,
+    );
 
     // Add blockquote to each line of the text
     const quotedTextLines = qt.text.split('\n');
     for (const line of quotedTextLines) {
-        quotedContent += `> ${line}\n`;
+        parts.push(`> ${line}\n`);
     }
-    quotedContent += "\n";
+    parts.push("\n");
 
     if (qt.images && qt.images.length > 0) {
-        quotedContent += "> **Images (quoted):**\n";
+        parts.push("> **Images (quoted):**\n");
         for (const imgUrl of qt.images) {
-            quotedContent += `> ![Quoted Image](${imgUrl})\n`;
+            parts.push(`> ![Quoted Image](${imgUrl})\n`);
         }
-        quotedContent += "\n";
+        parts.push("\n");
     }
-
-    return quotedContent;
 };
 
 
@@ -1,15 +1,47 @@
 // content_script.js
 
 (async () => {
+  // --- CONSTANTS ---
+  const IMAGE_SIZE_PARAM = '&name=';
+  const PARSED_ATTRIBUTE = 'data-tbe-parsed';
+  const GROWTH_POLL_INTERVAL_MS = 100;
+
   // --- UTILITY FUNCTIONS ---
   const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
 
+  // Resolves as soon as the page grows past `previousHeight` or the timeline
+  // shows its empty state, instead of always sleeping for the full timeout.
+  // Returns false if neither happens within `timeoutMs`.
+  const waitForPageGrowth = async (previousHeight, timeoutMs) => {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      if (document.body.scrollHeight !== previousHeight || document.querySelector('[data-testid="emptyState"]')) {
+        return true;
+      }
+      await sleep(GROWTH_POLL_INTERVAL_MS);
+    }
+    return false;
+  };
+
   const getStoredTweetIds = async () => {
     const data = await browser.storage.local.get('exportedTweetIds');
     return new Set(data.exportedTweetIds || []);
   };
 
+  const tweetIdFromUrl = (tweetUrl) => tweetUrl.split('/status/')[1].split('?')[0];
+
+  // Media URLs always end with the `&name=<size>` query parameter, so swap
+  // the size for the largest variant with plain string slicing.
+  const upscaleImageUrl = (src) => {
+    const index = src.lastIndexOf(IMAGE_SIZE_PARAM);
+    return index === -1 ? src : `${src.slice(0, index)}${IMAGE_SIZE_PARAM}large`;
+  };
+
   // --- PARSING LOGIC ---
+  // Tweets are located with plain CSS selectors (data-testid attributes,
+  // querySelector/querySelectorAll). Keep it that way: role- or text-based
+  // lookups have to compute accessible names for every candidate element and
+  // are noticeably slower on a long timeline.
   const parseTweetElement = (tweetElement) => {
     try {
       const linkElement = tweetElement.querySelector('a[href*="/status/"]');
@@ -18,13 +50,13 @@
       const tweetUrl = linkElement.href;
       if (!tweetUrl) return null;
 
-      const tweetId = tweetUrl.split('/status/')[1].split('?')[0];
+      const tweetId = tweetIdFromUrl(tweetUrl);
 
-      const authorElement = tweetElement.querySelector('[data-testid="User-Name"]');
-      const authorText = authorElement ? authorElement.innerText : "Unknown";
-      const authorParts = authorText.trim().split('\n');
-      const authorName = authorParts[0] || "Unknown";
-      const authorHandle = authorParts[1] || "@unknown";
+      // Display name and handle live in separate spans; reading them directly
+      // avoids splitting innerText on newlines (and the layout it forces)
+      const authorSpans = Array.from(tweetElement.querySelectorAll('[data-testid="User-Name"] span'), span => span.textContent.trim());
+      const authorName = authorSpans[0] || "Unknown";
+      const authorHandle = authorSpans.slice(1).find(text => text.startsWith('@')) || "@unknown";
 
       const textElement = tweetElement.querySelector('[data-testid="tweetText"]');
       const tweetText = textElement ? textElement.innerText : "";
@@ -32,29 +64,33 @@
       const timeElement = tweetElement.querySelector('time');
       const timestamp = timeElement ? timeElement.getAttribute('datetime') : "";
 
-      const images = Array.from(tweetElement.querySelectorAll('img[src*="pbs.twimg.com/media"]'))
-        .map(img => img.src.replace(/&name=\w+/, '&name=large'));
+      // Sets keep insertion order, so these dedupe without reordering media
+      const images = new Set();
+      for (const img of tweetElement.querySelectorAll('img[src*="pbs.twimg.com/media"]')) {
+        images.add(upscaleImageUrl(img.src));
+      }
 
-      let videos = [];
+      const videos = new Set();
       const videoElements = tweetElement.querySelectorAll('video');
       if (videoElements.length > 0) {
-        videos.push(`https://twitter.com${tweetUrl}`);
+        videos.add(`https://twitter.com${tweetUrl}`);
       }
 
       const cardLinks = tweetElement.querySelectorAll('[data-testid="card.wrapper"] a[href]');
       cardLinks.forEach(link => {
         const href = link.href;
         if (href && (href.includes('youtu.be') || href.includes('youtube.com') || href.includes('vimeo.com'))) {
-          videos.push(href);
+          videos.add(href);
         }
       });
 
       let quotedTweet = null;
-      const quoteContainer = tweetElement.querySelector("div[role='link'][tabindex='0']");
-      if (quoteContainer) {
-        const quotedArticle = quoteContainer.querySelector("article[data-testid='tweet']");
-        if (quotedArticle) {
-          quotedTweet = parseTweetElement(quotedArticle);
+      const quotedArticle = tweetElement.querySelector("div[role='link'][tabindex='0'] article[data-testid='tweet']");
+      if (quotedArticle) {
+        quotedTweet = parseTweetElement(quotedArticle);
+        // Guard against picking up the tweet itself as its own quote
+        if (quotedTweet && quotedTweet.id === tweetId) {
+          quotedTweet = null;
         }
       }
 
@@ -65,8 +101,8 @@
         text: tweetText,
         timestamp: timestamp,
         url: tweetUrl,
-        images: images,
-        videos: [...new Set(videos)], // Remove duplicates
+        images: [...images],
+        videos: [...videos],
         quoted_tweet: quotedTweet,
       };
 
@@ -76,6 +112,35 @@
     }
   };
 
+  // Reads only the tweet ID, for callers that don't need the full parse
+  const getTweetId = (tweetElement) => {
+    const linkElement = tweetElement.querySelector('a[href*="/status/"]');
+    return linkElement && linkElement.href ? tweetIdFromUrl(linkElement.href) : null;
+  };
+
+  // Walks the tweet articles that have not been parsed yet in a single pass
+  // and returns what `extract` (the full parser by default) yields for each.
+  // Each successfully parsed article is marked so that later scrolls only pay
+  // for newly rendered tweets.
+  const extractNewTweetsFromPage = (extract = parseTweetElement) => {
+    const tweets = [];
+    for (const tweetElement of document.querySelectorAll(`article[data-testid="tweet"]:not([${PARSED_ATTRIBUTE}])`)) {
+      const tweetData = extract(tweetElement);
+      if (tweetData) {
+        tweetElement.setAttribute(PARSED_ATTRIBUTE, '1');
+        tweets.push(tweetData);
+      }
+    }
+    return tweets;
+  };
+
+  // Forgets which articles were parsed so the next pass sees every tweet again
+  const clearParsedMarks = () => {
+    for (const tweetElement of document.querySelectorAll(`[${PARSED_ATTRIBUTE}]`)) {
+      tweetElement.removeAttribute(PARSED_ATTRIBUTE);
+    }
+  };
+
   // --- PROGRESS BAR MANAGEMENT ---
   const injectProgressBar = async () => {
     const response = await fetch(browser.runtime.getURL('progress.html'));
@@ -112,6 +177,9 @@
   const scrapeBookmarks = async () => {
     console.log("Starting bookmark collection...");
 
+    // Load previously exported IDs while the pre-scan runs; neither depends on the other
+    const storedTweetIdsPromise = getStoredTweetIds();
+
     // Inject the in-page progress bar
     await injectProgressBar();
 
@@ -119,6 +187,7 @@
     updateProgressBar(0, 100, 'Initializing...');
 
     // --- PRE-SCAN FOR TOTAL COUNT ---
+    clearParsedMarks();
     let totalBookmarks = 0;
     const prescanTweets = new Set();
     let lastHeight = 0;
@@ -126,11 +195,10 @@
     const prescanScrollDelay = 1500; // Faster scroll for pre-scan
 
     while (noChangeCount < 3) { // Stop if height doesn't change for a few scrolls
-      const elements = document.querySelectorAll('article[data-testid="tweet"]');
-      elements.forEach(el => {
-        const id = parseTweetElement(el)?.id;
-        if(id) prescanTweets.add(id);
-      });
+      // Only the IDs are needed to count bookmarks
+      for (const tweetId of extractNewTweetsFromPage(getTweetId)) {
+        prescanTweets.add(tweetId);
+      }
       totalBookmarks = prescanTweets.size;
 
       browser.runtime.sendMessage({
@@ -142,7 +210,7 @@
       updateProgressBar(0, totalBookmarks, `Found ${totalBookmarks} bookmarks. Preparing...`);
 
       window.scrollTo(0, document.body.scrollHeight);
-      await sleep(prescanScrollDelay);
+      await waitForPageGrowth(lastHeight, prescanScrollDelay);
 
       const newHeight = document.body.scrollHeight;
       if (newHeight === lastHeight) {
@@ -156,7 +224,8 @@
      await sleep(1000); // Wait for page to settle
 
     // --- DETAILED SCRAPE ---
-    const storedTweetIds = await getStoredTweetIds();
+    clearParsedMarks();
+    const storedTweetIds = await storedTweetIdsPromise;
     const collectedTweets = [];
     const tweetsSeenOnPage = new Set();
     let noNewTweetsCount = 0;
@@ -164,12 +233,10 @@
     const scrollDelayMs = 2500;
 
     while (true) {
-      const tweetElements = document.querySelectorAll('article[data-testid="tweet"]');
       let newTweetsFoundThisScroll = 0;
 
-      for (const tweetElement of tweetElements) {
-        const tweetData = parseTweetElement(tweetElement);
-        if (tweetData && !tweetsSeenOnPage.has(tweetData.id)) {
+      for (const tweetData of extractNewTweetsFromPage()) {
+        if (!tweetsSeenOnPage.has(tweetData.id)) {
           tweetsSeenOnPage.add(tweetData.id);
 
           if (!storedTweetIds.has(tweetData.id)) {
@@ -179,7 +246,10 @@
         }
       }
 
-      console.log(`Collected ${collectedTweets.length} new unique tweets so far...`);
+      // Log only when the total crosses another multiple of 100
+      if (newTweetsFoundThisScroll > 0 && collectedTweets.length % 100 < newTweetsFoundThisScroll) {
+        console.log(`Collected ${collectedTweets.length} new unique tweets so far...`);
+      }
        browser.runtime.sendMessage({
           action: 'export-progress',
           progress: tweetsSeenOnPage.size, // Progress based on total seen
@@ -199,8 +269,9 @@
         noNewTweetsCount = 0; // Reset counter if we find new tweets
       }
 
-      window.scrollTo(0, document.body.scrollHeight);
-      await sleep(scrollDelayMs);
+      const heightBeforeScroll = document.body.scrollHeight;
+      window.scrollTo(0, heightBeforeScroll);
+      await waitForPageGrowth(heightBeforeScroll, scrollDelayMs);
     }
 
     // Send final data to background script
@@ -16,12 +16,10 @@ async def main():
         )
 
         page = await browser_context.new_page()
-        await page.goto('https://twitter.com/i/bookmarks')
+        await page.goto('https://twitter.com/i/bookmarks', wait_until='domcontentloaded')
 
-        # Give the content script a moment to load and start the export
-        await page.wait_for_timeout(2000)
-
-        # Wait for the progress bar to appear
+        # Wait for the progress bar to appear; this is the real readiness signal.
+        # Use CSS selectors rather than get_by_role/get_by_text, which are slower.
         await page.wait_for_selector('#tbe-progress-container', timeout=5000)
 
         # Take a screenshot